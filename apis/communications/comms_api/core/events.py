@@ -161,10 +161,12 @@ def parse_tasks_results(tasks_results: List[dict]) -> List[TaskResult]:
     """
     results: List[TaskResult] = []
 
+    # The responses come from the indexer and are already validated, so the models are built
+    # using `model_construct` to skip the per-field validation pass.
     for r in tasks_results:
         status = r[IndexerKey.STATUS]
         if status >= HTTP_STATUS_OK and status <= HTTP_STATUS_PARTIAL_CONTENT:
-            task_result = TaskResult(
+            task_result = TaskResult.model_construct(
                 index=r[IndexerKey._INDEX],
                 id=r[IndexerKey._ID],
                 result=r[IndexerKey.RESULT],
@@ -175,8 +177,8 @@ def parse_tasks_results(tasks_results: List[dict]) -> List[TaskResult]:
                 error_reason = r[IndexerKey.RESULT]
             else:
                 error_reason = r[IndexerKey.ERROR][IndexerKey.REASON]
-                    
-            task_result = TaskResult(
+
+            task_result = TaskResult.model_construct(
                 index=r[IndexerKey._INDEX],
                 id=r[IndexerKey._ID],
                 result=error_reason,
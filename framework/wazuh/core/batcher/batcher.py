@@ -1,11 +1,11 @@
 import asyncio
 import os
-import uuid
 import queue
 import signal
 import traceback
 import logging
-from typing import List, Optional
+from collections import defaultdict
+from typing import Dict, List, Optional
 from multiprocessing import Process
 
 from opensearchpy.exceptions import RequestError
@@ -24,6 +24,8 @@ logger = logging.getLogger('wazuh-comms-api')
 
 QUEUE_READ_INTERVAL = 0.01
 
+_OPERATION_BY_ACTION = {operation.value: operation for operation in Operation}
+
 
 class Batcher:
     """Manage the batching of items from a MuxDemuxQueue and send them in bulk to an indexer.
@@ -87,26 +89,42 @@ class Batcher:
 
         try:
             async with get_indexer_client() as indexer_client:
-                bulk_list = create_bulk_list(items=items)
-                response = await indexer_client.bulk(data=bulk_list)
-
-                item_ids: List[uuid.UUID] = [item.id for item in items]
-                for response_item, item_id in zip(response['items'], item_ids):
-                    action_found = False
+                # Send one bulk request per target index concurrently instead of a single
+                # serial request, letting the indexer process the batches in parallel.
+                groups = group_by_index(items=items)
+                # Exceptions are returned instead of raised so one failing index does
+                # not discard the sibling groups' responses nor leave their bulk tasks
+                # running against an already closed client.
+                responses = await asyncio.gather(
+                    *(indexer_client.bulk(data=create_bulk_list(items=group)) for group in groups.values()),
+                    return_exceptions=True
+                )
 
-                    for operation in Operation:
-                        if operation.value in response_item:
-                            action_found = True
-                            item = Item(id=item_id, content=response_item[operation.value], operation=operation)
+                response_pairs = []
+                for (index_name, group), response in zip(groups.items(), responses):
+                    if isinstance(response, BaseException):
+                        logger.error(f"Error sending bulk request for index '{index_name}': {response}")
+                        continue
+                    response_pairs.extend(zip(response['items'], (item.id for item in group)))
+
+                for response_item, item_id in response_pairs:
+                    operation = None
+                    for action in response_item:
+                        operation = _OPERATION_BY_ACTION.get(action)
+                        if operation is not None:
+                            break
+
+                    if operation is None:
+                        logger.error(f"Error processing batcher response, no known action in: {response_item}")
+                        continue
 
-                            # Adds it to the respective packet
-                            for input_packet in input_packets:
-                                for output_packet in output_packets:
-                                    if input_packet.id == output_packet.id and input_packet.has_item(item.id):
-                                        output_packet.add_item(item)
+                    item = Item(id=item_id, content=response_item[operation.value], operation=operation)
 
-                    if not action_found:
-                        logger.error(f"Error processing batcher response, no known action in: {response_item}")
+                    # Adds it to the respective packet
+                    for input_packet in input_packets:
+                        for output_packet in output_packets:
+                            if input_packet.id == output_packet.id and input_packet.has_item(item.id):
+                                output_packet.add_item(item)
 
             for packet in output_packets:
                 self.queue.send_to_demux(packet)
@@ -213,15 +231,54 @@ class BatcherProcess(Process):
         asyncio.run(batcher.run())
 
 
+def _create_doc(item: Item) -> BulkDoc:
+    """Build a bulk document for the 'create' operation."""
+    return BulkDoc.create(index=item.index_name, doc_id=item.id, doc=item.content)
+
+
+def _update_doc(item: Item) -> BulkDoc:
+    """Build a bulk document for the 'update' operation."""
+    return BulkDoc.update(index=item.index_name, doc_id=item.id, doc=item.content)
+
+
+def _delete_doc(item: Item) -> BulkDoc:
+    """Build a bulk document for the 'delete' operation."""
+    return BulkDoc.delete(index=item.index_name, doc_id=item.id)
+
+
+_OPERATION_BUILDERS = {
+    Operation.CREATE.value: _create_doc,
+    Operation.UPDATE.value: _update_doc,
+    Operation.DELETE.value: _delete_doc,
+}
+
+
+def group_by_index(items: List[Item]) -> Dict[str, List[Item]]:
+    """Group items by the index name they are routed to, preserving the buffer order.
+
+    Parameters
+    ----------
+    items : List[Item]
+        Items to group.
+
+    Returns
+    -------
+    Dict[str, List[Item]]
+        Items keyed by index name.
+    """
+    groups: Dict[str, List[Item]] = defaultdict(list)
+    for item in items:
+        groups[item.index_name].append(item)
+
+    return groups
+
+
 def create_bulk_list(items: List[Item]) -> List[BulkDoc]:
     """Create a bulk list with documents depending on the operation performed."""
     docs: List[BulkDoc] = []
     for item in items:
-        if item.operation == Operation.CREATE.value:
-            docs.append(BulkDoc.create(index=item.index_name, doc_id=item.id, doc=item.content))
-        elif item.operation == Operation.DELETE.value:
-            docs.append(BulkDoc.delete(index=item.index_name, doc_id=item.id))
-        elif item.operation == Operation.UPDATE.value:
-            docs.append(BulkDoc.update(index=item.index_name, doc_id=item.id, doc=item.content))
+        builder = _OPERATION_BUILDERS.get(item.operation)
+        if builder is not None:
+            docs.append(builder(item))
 
     return docs
@@ -48,6 +48,17 @@ class Packet:
             items = []
         self.id: None | int = id
         self.items: list[Item] = items
+        self._agent_metadata: None | AgentMetadata = None
+        self._agent_metadata_json: None | bytes = None
+
+    def __getstate__(self) -> dict:
+        """Drop the metadata serialization cache when pickling: each item's content
+        already embeds it, so shipping it over the queues would only grow the payload.
+        """
+        state = self.__dict__.copy()
+        state['_agent_metadata'] = None
+        state['_agent_metadata_json'] = None
+        return state
 
     def add_id(self, id: int):
         """Sets the packet's identifier.
@@ -111,7 +122,12 @@ class Packet:
         """
         content = None
         if data is not None:
-            content = self.build_content(agent_metadata.model_dump_json().encode(), data)
+            # All the items of a packet usually share the same agent metadata, so the
+            # serialized form is cached and reused instead of dumping it per item.
+            if self._agent_metadata is not agent_metadata:
+                self._agent_metadata = agent_metadata
+                self._agent_metadata_json = agent_metadata.model_dump_json().encode()
+            content = self.build_content(self._agent_metadata_json, data)
 
         item = Item(
             id=header.id,
@@ -0,0 +1,96 @@
+import asyncio
+from unittest.mock import AsyncMock, MagicMock, patch
+
+from opensearchpy.exceptions import TransportError
+
+from framework.wazuh.core.batcher.batcher import Batcher, create_bulk_list, group_by_index
+from framework.wazuh.core.batcher.mux_demux import Item, Packet
+from wazuh.core.config.models.comms_api import BatcherConfig
+from wazuh.core.indexer.bulk import Operation
+
+
+def test_group_by_index():
+    """Check that the `group_by_index` function works as expected."""
+    items = [
+        Item(id='1', operation=Operation.CREATE.value, content={}, index_name='index-a'),
+        Item(id='2', operation=Operation.CREATE.value, content={}, index_name='index-b'),
+        Item(id='3', operation=Operation.CREATE.value, content={}, index_name='index-a'),
+    ]
+
+    groups = group_by_index(items=items)
+
+    assert list(groups.keys()) == ['index-a', 'index-b']
+    assert [item.id for item in groups['index-a']] == ['1', '3']
+    assert [item.id for item in groups['index-b']] == ['2']
+
+
+def test_create_bulk_list():
+    """Check that the `create_bulk_list` function works as expected."""
+    items = [
+        Item(id='1', operation=Operation.CREATE.value, content={}, index_name='index-a'),
+        Item(id='2', operation=Operation.DELETE.value, content=None, index_name='index-a'),
+        Item(id='3', operation='invalid', content={}, index_name='index-a'),
+    ]
+
+    docs = create_bulk_list(items=items)
+
+    assert [doc.metadata.operation for doc in docs] == [Operation.CREATE, Operation.DELETE]
+    assert [doc.metadata.doc_id for doc in docs] == ['1', '2']
+
+
+def _indexer_client_mock(bulk_side_effect) -> MagicMock:
+    """Build a `get_indexer_client` replacement whose `bulk` uses the given side effect."""
+    indexer_client = MagicMock()
+    indexer_client.bulk = AsyncMock(side_effect=bulk_side_effect)
+
+    client_context = MagicMock()
+    client_context.__aenter__ = AsyncMock(return_value=indexer_client)
+    client_context.__aexit__ = AsyncMock(return_value=False)
+    return MagicMock(return_value=client_context)
+
+
+def test_send_buffer_reassociates_per_group_responses():
+    """Check that `_send_buffer` matches each group's bulk response with its items."""
+    packet = Packet()
+    packet.add_item(Item(id='1', operation=Operation.CREATE.value, content={}, index_name='index-a'))
+    packet.add_item(Item(id='2', operation=Operation.CREATE.value, content={}, index_name='index-b'))
+    packet.add_item(Item(id='3', operation=Operation.CREATE.value, content={}, index_name='index-a'))
+
+    responses_by_index = {
+        'index-a': {'items': [{'create': {'_id': '1', 'result': 'created'}},
+                              {'create': {'_id': '3', 'result': 'created'}}]},
+        'index-b': {'items': [{'create': {'_id': '2', 'result': 'created'}}]},
+    }
+
+    async def bulk(data):
+        return responses_by_index[data[0].metadata.index]
+
+    queue_mock = MagicMock()
+    batcher = Batcher(mux_demux_queue=queue_mock, config=BatcherConfig())
+
+    with patch('framework.wazuh.core.batcher.batcher.get_indexer_client', _indexer_client_mock(bulk)):
+        asyncio.run(batcher._send_buffer([packet]))
+
+    output_packet = queue_mock.send_to_demux.call_args[0][0]
+    assert sorted(item.id for item in output_packet.items) == ['1', '2', '3']
+
+
+def test_send_buffer_keeps_successful_groups_on_failure():
+    """Check that `_send_buffer` still demuxes the groups whose bulk request succeeded."""
+    packet = Packet()
+    packet.add_item(Item(id='1', operation=Operation.CREATE.value, content={}, index_name='index-a'))
+    packet.add_item(Item(id='2', operation=Operation.CREATE.value, content={}, index_name='index-b'))
+
+    async def bulk(data):
+        if data[0].metadata.index == 'index-b':
+            raise TransportError(500, 'error')
+        return {'items': [{'create': {'_id': '1', 'result': 'created'}}]}
+
+    queue_mock = MagicMock()
+    batcher = Batcher(mux_demux_queue=queue_mock, config=BatcherConfig())
+
+    with patch('framework.wazuh.core.batcher.batcher.get_indexer_client', _indexer_client_mock(bulk)):
+        asyncio.run(batcher._send_buffer([packet]))
+
+    output_packet = queue_mock.send_to_demux.call_args[0][0]
+    assert [item.id for item in output_packet.items] == ['1']
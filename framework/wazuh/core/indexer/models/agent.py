@@ -49,7 +49,7 @@ class Status(str, Enum):
     NEVER_CONNECTED = 'never_connected'
 
 
-@dataclass
+@dataclass(slots=True)
 class OS:
     """Agent operating system information."""
     name: str = None
@@ -57,7 +57,7 @@ class OS:
     version: str = None
 
 
-@dataclass
+@dataclass(slots=True)
 class Host:
     """Agent host information."""
     architecture: str = None
@@ -3,7 +3,7 @@ from enum import Enum
 from typing import List
 
 
-@dataclass
+@dataclass(slots=True)
 class Action:
     """Command action data model."""
     name: str
@@ -11,7 +11,7 @@ class Action:
     args: dict = None
 
 
-@dataclass
+@dataclass(slots=True)
 class Result:
     """Command result data model."""
     code: int = None
@@ -41,7 +41,7 @@ class TargetType(str, Enum):
     SERVER = 'server'
 
 
-@dataclass
+@dataclass(slots=True)
 class Target:
     """Command target data model."""
     # TODO(25121): this should be a UUID, but pydantic supports up to v5 only.
@@ -50,7 +50,7 @@ class Target:
     type: TargetType
 
 
-@dataclass
+@dataclass(slots=True)
 class Command:
     """Command data model."""
     document_id: str = None
@@ -82,7 +82,7 @@ class ResponseResult(str, Enum):
     NOT_FOUND = 'Not found'
 
 
-@dataclass
+@dataclass(slots=True)
 class CreateCommandResponse:
     """Create command response data model."""
     index: str
@@ -1,5 +1,8 @@
+import sys
+from dataclasses import dataclass, field
 from enum import Enum
-from typing import Dict, List, Optional
+from functools import lru_cache
+from typing import Dict, Iterable, Iterator, List, Optional
 
 from pydantic import BaseModel
 
@@ -8,16 +11,16 @@ from wazuh.core.indexer.bulk import Operation
 from wazuh.core.indexer.commands import CommandsManager
 from wazuh.core.indexer.models.agent import Host as AgentHost
 
-FIM_INDEX = 'wazuh-states-fim'
-INVENTORY_HARDWARE_INDEX = 'wazuh-states-inventory-hardware'
-INVENTORY_HOTFIXES_INDEX = 'wazuh-states-inventory-hotfixes'
-INVENTORY_NETWORKS_INDEX = 'wazuh-states-inventory-networks'
-INVENTORY_PACKAGES_INDEX = 'wazuh-states-inventory-packages'
-INVENTORY_PORTS_INDEX = 'wazuh-states-inventory-ports'
-INVENTORY_PROCESSES_INDEX = 'wazuh-states-inventory-processes'
-INVENTORY_SYSTEM_INDEX = 'wazuh-states-inventory-system'
-SCA_INDEX = 'wazuh-states-sca'
-VULNERABILITY_INDEX = 'wazuh-states-vulnerabilities'
+FIM_INDEX = sys.intern('wazuh-states-fim')
+INVENTORY_HARDWARE_INDEX = sys.intern('wazuh-states-inventory-hardware')
+INVENTORY_HOTFIXES_INDEX = sys.intern('wazuh-states-inventory-hotfixes')
+INVENTORY_NETWORKS_INDEX = sys.intern('wazuh-states-inventory-networks')
+INVENTORY_PACKAGES_INDEX = sys.intern('wazuh-states-inventory-packages')
+INVENTORY_PORTS_INDEX = sys.intern('wazuh-states-inventory-ports')
+INVENTORY_PROCESSES_INDEX = sys.intern('wazuh-states-inventory-processes')
+INVENTORY_SYSTEM_INDEX = sys.intern('wazuh-states-inventory-system')
+SCA_INDEX = sys.intern('wazuh-states-sca')
+VULNERABILITY_INDEX = sys.intern('wazuh-states-vulnerabilities')
 
 
 class Agent(BaseModel):
@@ -35,6 +38,62 @@ class AgentMetadata(BaseModel):
     agent: Agent
 
 
+@dataclass
+class AgentMetadataBatch:
+    """Column-oriented batch of agent metadata.
+
+    Each `Agent` field is stored as its own list so batch scans that only need a couple
+    of columns, e.g. `id` and `version`, do not touch whole `AgentMetadata` objects.
+    """
+    id: List[str] = field(default_factory=list)
+    name: List[str] = field(default_factory=list)
+    groups: List[List[str]] = field(default_factory=list)
+    type: List[str] = field(default_factory=list)
+    version: List[str] = field(default_factory=list)
+    host: List[AgentHost] = field(default_factory=list)
+
+    @classmethod
+    def from_metadata(cls, metadata: Iterable[AgentMetadata]) -> 'AgentMetadataBatch':
+        """Build a columnar batch from per-agent metadata records.
+
+        Parameters
+        ----------
+        metadata : Iterable[AgentMetadata]
+            Metadata records to materialize.
+
+        Returns
+        -------
+        AgentMetadataBatch
+            Columnar batch holding the records' fields.
+        """
+        batch = cls()
+        for item in metadata:
+            agent = item.agent
+            batch.id.append(agent.id)
+            batch.name.append(agent.name)
+            batch.groups.append(agent.groups)
+            batch.type.append(agent.type)
+            batch.version.append(agent.version)
+            batch.host.append(agent.host)
+
+        return batch
+
+    def iter_metadata(self) -> Iterator[AgentMetadata]:
+        """Iterate over the batch rebuilding per-agent metadata records.
+
+        Returns
+        -------
+        Iterator[AgentMetadata]
+            Metadata record for each agent in the batch.
+        """
+        for id_, name, groups, type_, version, host in zip(
+            self.id, self.name, self.groups, self.type, self.version, self.host
+        ):
+            yield AgentMetadata(
+                agent=Agent(id=id_, name=name, groups=groups, type=type_, version=version, host=host)
+            )
+
+
 class TaskResult(BaseModel):
     """Stateful event bulk task result data model."""
     index: str
@@ -71,59 +130,72 @@ class Collector(str, Enum):
     PROCESSES = 'processes'
 
 
-STATEFUL_EVENTS_INDICES: Dict[Module, str] = {
-    Module.FIM: FIM_INDEX,
-    Module.SCA: SCA_INDEX,
-    Module.VULNERABILITY: VULNERABILITY_INDEX,
-    Module.COMMAND: CommandsManager.INDEX
+# The routing tables are keyed by the interned member values instead of the Enum members
+# themselves, so lookups on the event path hit the plain-string dict fast path and work
+# with raw strings as well as `Module`/`Collector` members.
+STATEFUL_EVENTS_INDICES: Dict[str, str] = {
+    sys.intern(Module.FIM.value): FIM_INDEX,
+    sys.intern(Module.SCA.value): SCA_INDEX,
+    sys.intern(Module.VULNERABILITY.value): VULNERABILITY_INDEX,
+    sys.intern(Module.COMMAND.value): CommandsManager.INDEX
 }
 
-INVENTORY_EVENTS: Dict[Collector, str] = {
-    Collector.HARDWARE: INVENTORY_HARDWARE_INDEX,
-    Collector.HOTFIXES: INVENTORY_HOTFIXES_INDEX,
-    Collector.PACKAGES: INVENTORY_PACKAGES_INDEX,
-    Collector.NETWORKS: INVENTORY_NETWORKS_INDEX,
-    Collector.SYSTEM: INVENTORY_SYSTEM_INDEX,
-    Collector.PORTS: INVENTORY_PORTS_INDEX,
-    Collector.PROCESSES: INVENTORY_PROCESSES_INDEX
+INVENTORY_EVENTS: Dict[str, str] = {
+    sys.intern(Collector.HARDWARE.value): INVENTORY_HARDWARE_INDEX,
+    sys.intern(Collector.HOTFIXES.value): INVENTORY_HOTFIXES_INDEX,
+    sys.intern(Collector.PACKAGES.value): INVENTORY_PACKAGES_INDEX,
+    sys.intern(Collector.NETWORKS.value): INVENTORY_NETWORKS_INDEX,
+    sys.intern(Collector.SYSTEM.value): INVENTORY_SYSTEM_INDEX,
+    sys.intern(Collector.PORTS.value): INVENTORY_PORTS_INDEX,
+    sys.intern(Collector.PROCESSES.value): INVENTORY_PROCESSES_INDEX
+}
+
+# Flat resolution table covering every valid (module, collector) combination, so the
+# index name resolves with a single hashed lookup.
+_INDEX_BY_MODULE_AND_COLLECTOR: Dict[tuple, str] = {
+    **{(module, None): index for module, index in STATEFUL_EVENTS_INDICES.items()},
+    **{(Module.INVENTORY.value, collector): index for collector, index in INVENTORY_EVENTS.items()},
 }
 
 
+@lru_cache(maxsize=32)
 def get_module_index_name(module: Module, collector: Optional[str] = None) -> str:
     """Get the index name corresponding to the specified module and type.
 
+    The resolution is memoized: there are only a handful of valid `(module, collector)`
+    combinations and batches are usually homogeneous, so repeated calls become a single
+    cache lookup. Failed resolutions raise and are not cached.
+
     Parameters
     ----------
     module : Module
         Event module.
     collector : Optional[str]
         Event module collector.
-    
+
     Raises
     ------
     WazuhError(1763)
         Invalid inventory module type error.
     WazuhError(1765)
         Invalid module name.
-    
+
     Returns
     -------
     str
         Index name.
     """
-    if module == Module.INVENTORY:
-        collectors = list(INVENTORY_EVENTS.keys())
-        if collector not in collectors:
+    is_inventory = module == Module.INVENTORY
+    try:
+        return _INDEX_BY_MODULE_AND_COLLECTOR[(module, collector if is_inventory else None)]
+    except KeyError:
+        if is_inventory:
+            collectors = list(INVENTORY_EVENTS.keys())
             extra_info = {
                 'collectors': ', '.join(collectors[:-1]) + ' or ' + collectors[-1]
             }
             raise WazuhError(1763, extra_message=extra_info)
-        
-        return INVENTORY_EVENTS[collector]
 
-    try:
-        return STATEFUL_EVENTS_INDICES[module]
-    except KeyError:
         modules = list(STATEFUL_EVENTS_INDICES.keys())
         extra_info = {
             'modules': ', '.join(modules[:-1]) + ' or ' + modules[-1]
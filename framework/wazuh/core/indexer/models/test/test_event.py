@@ -1,10 +1,11 @@
 import pytest
 
 from wazuh.core.exception import WazuhError
+from wazuh.core.indexer.models.agent import Host, OS
 from wazuh.core.indexer.models.events import get_module_index_name, Module, FIM_INDEX, SCA_INDEX, \
     VULNERABILITY_INDEX, INVENTORY_NETWORKS_INDEX, INVENTORY_PACKAGES_INDEX, INVENTORY_PROCESSES_INDEX, \
     INVENTORY_SYSTEM_INDEX, INVENTORY_HOTFIXES_INDEX, INVENTORY_PORTS_INDEX, INVENTORY_HARDWARE_INDEX, \
-    Collector, CommandsManager
+    Agent, AgentMetadata, AgentMetadataBatch, Collector, CommandsManager
 
 
 @pytest.mark.parametrize('module, type, expected_name', [
@@ -35,3 +36,53 @@ def test_get_module_index_name_ko(module, type, exception):
     """Validate that the `get_module_index_name` fails if the module is not valid."""
     with pytest.raises(WazuhError, match=rf'{exception}'):
         get_module_index_name(module, type)
+
+
+def test_agent_metadata_batch_round_trip():
+    """Validate that `AgentMetadataBatch.from_metadata` and `iter_metadata` are inverses."""
+    metadata = [
+        AgentMetadata(agent=Agent(
+            id='01929571-49b5-75e8-a3f6-1d2b84f4f71a',
+            name='test',
+            groups=['group1', 'group2'],
+            type='endpoint',
+            version='5.0.0',
+            host=Host(
+                architecture='x86_64',
+                ip='127.0.0.1',
+                os=OS(
+                    name='Debian 12',
+                    type='Linux'
+                )
+            ),
+        )),
+        AgentMetadata(agent=Agent(
+            id='01929571-49b5-75e8-a3f6-1d2b84f4f71b',
+            name='test2',
+            groups=[],
+            type='endpoint',
+            version='5.0.1',
+            host=Host(
+                architecture='aarch64',
+                ip='192.168.0.10',
+                os=OS(
+                    name='Ubuntu 24.04',
+                    type='Linux'
+                )
+            ),
+        )),
+    ]
+
+    batch = AgentMetadataBatch.from_metadata(metadata)
+
+    assert batch.id == ['01929571-49b5-75e8-a3f6-1d2b84f4f71a', '01929571-49b5-75e8-a3f6-1d2b84f4f71b']
+    assert batch.version == ['5.0.0', '5.0.1']
+    assert list(batch.iter_metadata()) == metadata
+
+
+def test_agent_metadata_batch_empty():
+    """Validate that an empty `AgentMetadataBatch` round-trips to no records."""
+    batch = AgentMetadataBatch.from_metadata([])
+
+    assert batch.id == []
+    assert list(batch.iter_metadata()) == []
@@ -1,12 +1,21 @@
 #!/usr/bin/env python3
 from typing import List, Tuple, Optional, Union, Dict
 from pathlib import Path
+import bisect
+import functools
+import operator
 import docker
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 import json
+import orjson
+import os
 import time
 import sys
 import subprocess
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from shared.default_settings import Constants, CONFIG_ENV_KEYS
 from engine_handler.handler import EngineHandler
 from api_communication.proto import catalog_pb2 as api_catalog
@@ -19,6 +28,8 @@ from datetime import datetime
 from health_test.utils import *
 
 class UnitOutput:
+    __slots__ = ('index', 'success', 'error', 'output')
+
     def __init__(self, index: int, result: Union[str, dict]):
         self.index = index
         if isinstance(result, str):
@@ -30,6 +41,8 @@ class UnitOutput:
 
 
 class UnitResult:
+    __slots__ = ('index', 'expected', 'diff', 'success')
+
     def __init__(self, index: int, expected: dict, actual: dict):
         self.index = index
         self.expected = expected
@@ -60,18 +73,9 @@ class UnitResult:
                                   "actual": filtered_actual[key]}
 
 
-class UnitOutput:
-    def __init__(self, index: int, result: Union[str, dict]):
-        self.index = index
-        if isinstance(result, str):
-            self.success = False
-            self.error = result
-        elif isinstance(result, dict):
-            self.success = True
-            self.output = result
-
-
 class EngineTestOutput:
+    __slots__ = ('name', 'command', 'results')
+
     def __init__(self, name: str, command: str):
         self.name = name
         self.command = command
@@ -82,6 +86,8 @@ class EngineTestOutput:
 
 
 class TestResult:
+    __slots__ = ('name', 'results', 'success', 'test_error', 'command')
+
     def __init__(self, name: str, command: Optional[str] = None):
         self.name = name
         self.results: List[UnitResult] = []
@@ -100,6 +106,8 @@ class TestResult:
 
 
 class Result:
+    __slots__ = ('name', 'results', 'success', 'test_error')
+
     def __init__(self, name: str):
         self.name = name
         self.results: List[TestResult] = []
@@ -116,25 +124,28 @@ class Result:
         self.test_error = error
 
     def __str__(self) -> str:
-        out = f"{self.name} -> {'Success' if self.success else 'Failure'}"
+        # Accumulate the report pieces and join once; += re-copies the whole string
+        # on every append, which is quadratic on large failure reports.
+        parts = [f"{self.name} -> {'Success' if self.success else 'Failure'}"]
         if self.test_error:
-            out += f"\n  Error: {self.test_error}"
+            parts.append(f"\n  Error: {self.test_error}")
         elif not self.success:
             for result in self.results:
-                out += f"\n  {result.name} -> {'Success' if result.success else 'Failure'}"
+                parts.append(f"\n  {result.name} -> {'Success' if result.success else 'Failure'}")
                 if not result.success and result.command:
-                    out += f"\n    Command: {result.command}"
+                    parts.append(f"\n    Command: {result.command}")
                 if result.test_error:
-                    out += f"\n    Error: {result.test_error}"
+                    parts.append(f"\n    Error: {result.test_error}")
                 elif not result.success:
-                    out += "\n    Event index:"
+                    parts.append("\n    Event index:")
                     for unit_result in result.results:
-                        out += f"\n      {unit_result.index} -> {'Success' if unit_result.success else 'Failure'}"
+                        parts.append(
+                            f"\n      {unit_result.index} -> {'Success' if unit_result.success else 'Failure'}")
                         if not unit_result.success:
                             for key, value in unit_result.diff.items():
-                                out += f"\n        {key}: {value}"
+                                parts.append(f"\n        {key}: {value}")
 
-        return out
+        return ''.join(parts)
 
 
 def is_valid_date(value):
@@ -207,41 +218,123 @@ def load_custom_fields(integration, custom_fields_path, allowed_types):
         sys.exit(f"Error loading custom fields from {custom_fields_path}: {e}")
 
 
-def get_value_from_hierarchy(data, field):
-    keys = field.split('.')
-    value = data
+@functools.lru_cache(maxsize=4096)
+def _field_path(field: str) -> tuple:
+    """Memoized dotted-path split; the same field names recur for every hit."""
+    return tuple(field.split('.'))
 
-    for key in keys:
-        if isinstance(value, dict) and key in value:
-            value = value[key]
-        else:
+
+def build_field_trie(custom_fields):
+    """
+    Build a nested dict trie from the custom fields map so each hit is walked once,
+    descending only into subtrees present in both the trie and the document.
+    """
+    trie = {}
+    for field, (type_, validation_fn) in custom_fields.items():
+        node = trie
+        for segment in _field_path(field):
+            node = node.setdefault(segment, {})
+        node['__leaf__'] = (field, type_, validation_fn)
+
+    return trie
+
+
+@functools.lru_cache(maxsize=4096)
+def _path_getter(field: str):
+    """Build one accessor per field from operator.itemgetter steps, compiled once
+    and reused for every document the field is looked up in."""
+    getters = [operator.itemgetter(segment) for segment in _field_path(field)]
+
+    def get(data):
+        try:
+            for getter in getters:
+                data = getter(data)
+        except (KeyError, TypeError, IndexError):
             return None
+        return data
+
+    return get
 
-    return value
+
+def get_value_from_hierarchy(data, field):
+    return _path_getter(field)(data)
 
 
 class OpensearchManagement:
     def __init__(self):
         self.offset = 0
+        self._container = None
+        # One pooled keep-alive session for every OpenSearch call instead of a fresh
+        # TCP connection per request.
+        self.http = requests.Session()
+        # Transient errors back off exponentially and honor Retry-After instead of
+        # hammering the server with fixed-delay retries.
+        retries = Retry(total=3, backoff_factor=0.2, status_forcelist=[429, 502, 503, 504],
+                        allowed_methods=frozenset(['GET', 'PUT', 'POST', 'DELETE', 'HEAD']))
+        self.http.mount('http://', HTTPAdapter(pool_connections=10, pool_maxsize=20, max_retries=retries))
 
     def stop(self):
-        for container in self.client.containers.list():
-            try:
-                container.stop()
-                container.remove()
-            except Exception as e:
-                print(f"Error stopping or removing container {container.id}: {e}")
-        self.client.containers.prune()
+        # Tear down only the container started by init_opensearch instead of listing
+        # and pruning every container on the host.
+        container = self._container
+        if container is None:
+            return
+        try:
+            container.stop(timeout=5)
+            container.remove()
+        except Exception as e:
+            print(f"Error stopping or removing container {container.id}: {e}")
+        self._container = None
 
     def init_index(self, template_path: Path) -> requests.Response:
         with open(template_path, 'r') as template_file:
             template_json = json.load(template_file)
+            template = template_json['template']
+            # The index is short-lived and single-node: disable the periodic refresh and
+            # replicas during ingest; readers call refresh_index explicitly before searching.
+            settings = template.setdefault('settings', {}).setdefault('index', {})
+            settings['refresh_interval'] = '-1'
+            settings['number_of_replicas'] = 0
+            # Throwaway test data: fsync the translog in the background instead of
+            # on every indexing request.
+            settings['translog.durability'] = 'async'
             headers = {"Content-Type": "application/json"}
             url = f'http://localhost:9200/{Constants.INDEX_PATTERN}'
-            response = requests.put(url, data=json.dumps(template_json['template']), headers=headers)
+            response = self.http.put(url, data=json.dumps(template), headers=headers)
             return response
 
+    def refresh_index(self):
+        """Make the documents ingested so far searchable with a single explicit refresh."""
+        self.http.post(f'http://localhost:9200/{Constants.INDEX_PATTERN}/_refresh')
+
+    def _reuse_running_cluster(self, template_path: Path) -> bool:
+        """Reuse an already running cluster when OPENSEARCH_REUSE=1, wiping the index
+        contents instead of paying a container boot and index bootstrap per run."""
+        if os.environ.get('OPENSEARCH_REUSE') != '1':
+            return False
+        try:
+            if self.http.get('http://localhost:9200', timeout=5).status_code != 200:
+                return False
+        except requests.exceptions.ConnectionError:
+            return False
+
+        index_url = f'http://localhost:9200/{Constants.INDEX_PATTERN}'
+        if self.http.head(index_url).status_code == 200:
+            self.http.post(f'{index_url}/_delete_by_query?refresh=true',
+                           json={"query": {"match_all": {}}},
+                           headers={"Content-Type": "application/json"})
+        else:
+            self.init_index(template_path)
+
+        print("Reusing running OpenSearch cluster (OPENSEARCH_REUSE=1)")
+        return True
+
     def init_opensearch(self, template_path: Path):
+        # When reusing a cluster no container handle is kept, so stop() leaves it
+        # running for the next invocation.
+        if self._reuse_running_cluster(template_path):
+            return
+
         self.client = docker.from_env()
         env_vars = {
             'discovery.type': 'single-node',
@@ -249,34 +342,43 @@ class OpensearchManagement:
             'OPENSEARCH_INITIAL_ADMIN_PASSWORD': 'WazuhTest99$',
             'OPENSEARCH_LOG_LEVEL': 'TRACE'
         }
-        self.client.containers.run("opensearchproject/opensearch", detach=True, ports={'9200/tcp': 9200},
-                                   environment=env_vars, name='opensearch', stdout=True, stderr=True)
+        self._container = self.client.containers.run(
+            "opensearchproject/opensearch", detach=True, ports={'9200/tcp': 9200},
+            environment=env_vars, name='opensearch', stdout=True, stderr=True)
 
+        delay = 0.5
         while True:
             try:
-                response = requests.get('http://localhost:9200')
+                response = self.http.get('http://localhost:9200')
                 if response.status_code == 200:
                     if self.init_index(template_path).status_code == 200:
                         break
             except requests.exceptions.ConnectionError:
                 pass
-            time.sleep(1)
+            # Exponential backoff while the container boots; the cluster takes a while
+            # to come up, so a fixed 1s poll just wastes round trips early on.
+            time.sleep(delay)
+            delay = min(delay * 2, 10)
 
         try:
-            url_health = 'http://localhost:9200/_cluster/health?wait_for_status=green&timeout=10s'
-            response = requests.get(url_health)
+            url_health = 'http://localhost:9200/_cluster/health?wait_for_status=green&timeout=30s'
+            response = self.http.get(url_health)
             response.raise_for_status()
-            assert response.status_code == 200, f"Expected status code 200, but got {response.status_code}"
-            assert response.json()['status'] == 'green', f"Expected status 'green', but got {response.json()['status']}"
+            if response.status_code != 200:
+                raise AssertionError(f"Expected status code 200, but got {response.status_code}")
+            health_status = response.json()['status']
+            if health_status != 'green':
+                raise AssertionError(f"Expected status 'green', but got {health_status}")
             counter = 0
             while counter < 10:
                 url = 'http://localhost:9200/_cat/indices'
-                response = requests.get(url)
+                response = self.http.get(url)
                 if response.status_code == 200 and Constants.INDEX_PATTERN in response.text:
                     break
                 time.sleep(1)
                 counter += 1
-            assert counter < 10, "The index was not created"
+            if counter >= 10:
+                raise AssertionError("The index was not created")
 
         except requests.RequestException as e:
             print(f"HTTP request error: {e}")
@@ -289,39 +391,103 @@ class OpensearchManagement:
             self.stop()
 
     def check_custom_fields(self, custom_fields: dict, all_custom_fields: set, hits: list):
-        filtered_invalid_fields = set(all_custom_fields)
+        # The walk only ever removes fields, so once the set is empty no later hit
+        # can change the outcome.
+        if not all_custom_fields:
+            return
+
+        trie = build_field_trie(custom_fields)
+        # Sorted snapshot for the prefix discards below. Fields are only ever removed
+        # from all_custom_fields, so slices of a stale snapshot may contain already
+        # discarded entries, which difference_update ignores.
+        sorted_fields = sorted(all_custom_fields)
         for hit in hits:
-            for field, (type_, validate_function) in custom_fields.items():
-                expected_value = get_value_from_hierarchy(hit['_source'], field)
-                if expected_value == None:
+            self._walk_custom_fields(trie, hit['_source'], all_custom_fields, sorted_fields)
+            if not all_custom_fields:
+                return
+
+    def _walk_custom_fields(self, node: dict, source, all_custom_fields: set, sorted_fields: list):
+        leaf = node.get('__leaf__')
+        if leaf is not None:
+            field, type_, validate_function = leaf
+            if source is not None and validate_function(source):
+                if type_ == 'object':
+                    # All the fields under 'field.' sit in a contiguous run of the
+                    # sorted snapshot, bounded by 'field/' ('/' follows '.'), so two
+                    # bisections replace a scan over the whole set.
+                    lo = bisect.bisect_left(sorted_fields, field + '.')
+                    hi = bisect.bisect_left(sorted_fields, field + '/')
+                    all_custom_fields.difference_update(sorted_fields[lo:hi])
+                elif type_ == 'nested':
+                    all_custom_fields.clear()
+                else:
+                    all_custom_fields.discard(field)
+
+        if isinstance(source, dict):
+            for segment, child in node.items():
+                if segment == '__leaf__':
                     continue
-                if validate_function(expected_value):
-                    if type_ == 'object':
-                        for invalid_field in filtered_invalid_fields:
-                            if invalid_field.startswith(field + '.'):
-                                all_custom_fields.discard(invalid_field)
-                    elif type_ == 'nested':
-                        for invalid_field in filtered_invalid_fields:
-                            all_custom_fields.discard(invalid_field)
-                    else:
-                        all_custom_fields.discard(field)
+                if segment in source:
+                    self._walk_custom_fields(child, source[segment], all_custom_fields, sorted_fields)
 
-    def read_index(self, result: Result, custom_fields: dict, all_custom_fields: set, outputs_number: int, retries=10, delay=4):
-        url_search = f'http://localhost:9200/{Constants.INDEX_PATTERN}/_search'
+    def _scan_index(self, source_filter: Optional[dict] = None, page_size: int = 1000) -> list:
+        """Collect every hit with a point in time and search_after pagination, which
+        pages through the index in fixed-size chunks instead of asking for one
+        result window sized to the whole run."""
         headers = {"Content-Type": "application/json"}
-        terminate = False
-        for attempt in range(retries):
-            try:
+        response = self.http.post(
+            f'http://localhost:9200/{Constants.INDEX_PATTERN}/_search/point_in_time?keep_alive=1m')
+        response.raise_for_status()
+        pit_id = orjson.loads(response.content)['pit_id']
+
+        hits = []
+        search_after = None
+        try:
+            while True:
                 query = {
-                    "size": outputs_number,
+                    "size": page_size,
                     "query": {
                         "match_all": {}
-                    }
+                    },
+                    "pit": {"id": pit_id, "keep_alive": "1m"},
+                    "sort": [{"_shard_doc": {"order": "asc"}}]
                 }
+                if source_filter is not None:
+                    query["_source"] = source_filter
+                if search_after is not None:
+                    query["search_after"] = search_after
 
-                response = requests.post(url_search, json=query, headers=headers)
+                response = self.http.post('http://localhost:9200/_search', json=query, headers=headers)
                 response.raise_for_status()
-                hits = response.json()['hits']['hits']
+                # orjson decodes the raw bytes directly, skipping requests' charset
+                # detection and the slower stdlib parser on large hit lists.
+                page = orjson.loads(response.content)['hits']['hits']
+                hits.extend(page)
+                if len(page) < page_size:
+                    return hits
+                search_after = page[-1]['sort']
+        finally:
+            # The delete endpoint takes a list of PIT ids; a leaked PIT pins index
+            # segments until its keep-alive expires, so surface a failed close.
+            response = self.http.delete('http://localhost:9200/_search/point_in_time',
+                                        json={"pit_id": [pit_id]}, headers=headers)
+            if not response.ok:
+                print(f"Failed to close point in time ({response.status_code}): {response.text}")
+
+    def read_index(self, result: Result, custom_fields: dict, all_custom_fields: set, outputs_number: int, retries=10, delay=4):
+        terminate = False
+        source_filter = None
+        if custom_fields:
+            # The trie walk only descends into the branches holding custom fields,
+            # so skip fetching the rest of each document.
+            source_filter = {
+                "includes": sorted({field.split('.')[0] for field in custom_fields})
+            }
+
+        for attempt in range(retries):
+            try:
+                self.refresh_index()
+                hits = self._scan_index(source_filter)
                 if len(hits) == outputs_number:
                     terminate = True
                     self.check_custom_fields(custom_fields, all_custom_fields, hits)
@@ -341,66 +507,81 @@ opensearch_management = OpensearchManagement()
 
 
 def extract_fields(d):
-    def extract_keys(d, prefix=""):
-        result = []
-        if isinstance(d, dict):
-            for key, value in d.items():
-                new_prefix = f"{prefix}.{key}" if prefix else key
-                if isinstance(value, dict):
-                    result.extend(extract_keys(value, new_prefix))
-                elif isinstance(value, list):
-                    for i, item in enumerate(value):
-                        if isinstance(item, dict):
-                            result.extend(extract_keys(item, f"{new_prefix}[{i}]"))
-                        else:
-                            result.append(f"{new_prefix}")
-                else:
-                    result.append(new_prefix)
-        return result
-
-    return extract_keys(d)
-
+    """
+    Yield the flattened field paths of a document using an explicit stack, avoiding a
+    Python call frame and an intermediate list per nesting level.
+    """
+    stack = [(d, "")]
+    while stack:
+        node, prefix = stack.pop()
+        if not isinstance(node, dict):
+            continue
+        for key, value in node.items():
+            new_prefix = f"{prefix}.{key}" if prefix else key
+            if isinstance(value, dict):
+                stack.append((value, new_prefix))
+            elif isinstance(value, list):
+                for i, item in enumerate(value):
+                    if isinstance(item, dict):
+                        stack.append((item, f"{new_prefix}[{i}]"))
+                    else:
+                        yield new_prefix
+            else:
+                yield new_prefix
 
-def add_custom_fields(custom_fields: set, data_list, schema_fields):
-    for data_str in data_list:
-        try:
-            data = json.loads(data_str)
-            extracted_fields = extract_fields(data)
 
-            for field in extracted_fields:
-                if field not in schema_fields:
-                    custom_fields.add(field)
-        except json.JSONDecodeError as e:
-            print(f"Error decoding JSON: {e}")
+def add_custom_fields(custom_fields: set, events, schema_fields: frozenset):
+    for data in events:
+        # Bulk set difference in C instead of a Python-level membership test per field.
+        custom_fields |= set(extract_fields(data)) - schema_fields
 
 
-def execute(name: str, command: str, customs: set, schema_fields: list) -> Tuple[Optional[str], EngineTestOutput]:
-    result = EngineTestOutput(name, command)
-    try:
-        output = subprocess.check_output(
-            command, shell=True, stderr=subprocess.STDOUT)
-    except subprocess.CalledProcessError as e:
-        return f"Error executing command: {e.output.decode()}", result
+def execute(name: str, command: List[str], input_file: Path,
+            customs: set, schema_fields: list) -> Tuple[Optional[str], EngineTestOutput]:
+    result = EngineTestOutput(name, f"{' '.join(command)} < {input_file.as_posix()}")
 
-    output_str = output.decode('utf-8')
-    json_strings = output_str.strip().split('\n')
+    # Run engine-test directly with the input file as stdin instead of spawning a
+    # shell plus `cat`, and parse each stdout line as the child emits it rather than
+    # buffering the whole output first.
+    parsed_events = []
+    with open(input_file, 'rb') as stdin:
+        try:
+            process = subprocess.Popen(command, stdin=stdin, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+        except OSError as e:
+            return f"Error executing command: {e}", result
+
+        # Drain stderr on a side thread: reading stdout to EOF first would deadlock
+        # against a child blocked on a full stderr pipe.
+        stderr_chunks = []
+        stderr_reader = threading.Thread(target=lambda: stderr_chunks.append(process.stderr.read()))
+        stderr_reader.start()
+
+        index = 0
+        for json_line in process.stdout:
+            json_line = json_line.strip()
+            if not json_line:
+                continue
+            try:
+                parsed_json = orjson.loads(json_line)
+            except orjson.JSONDecodeError as e:
+                result.add_result(UnitOutput(index, f"Error parsing JSON: {e}"))
+            else:
+                parsed_events.append(parsed_json)
+                result.add_result(UnitOutput(index, parsed_json))
+            index += 1
 
-    add_custom_fields(customs, json_strings, schema_fields)
+        stderr_reader.join()
+        if process.wait() != 0:
+            return f"Error executing command: {b''.join(stderr_chunks).decode()}", result
 
-    for i, json_string in enumerate(json_strings):
-        try:
-            parsed_json = json.loads(json_string)
-        except json.JSONDecodeError as e:
-            result.add_result(UnitOutput(i, f"Error parsing JSON: {e}"))
-        else:
-            result.add_result(UnitOutput(i, parsed_json))
+    add_custom_fields(customs, parsed_events, schema_fields)
 
     return None, result
 
 
-def test(input_file: Path, command: str, customs: set, schema_fields: list) -> EngineTestOutput:
+def test(input_file: Path, command: List[str], customs: set, schema_fields: list) -> EngineTestOutput:
     name = input_file.stem.replace("_input", "")
-    error, output = execute(name, command, customs, schema_fields)
+    error, output = execute(name, command, input_file, customs, schema_fields)
 
     if error:
         print(error)
@@ -432,18 +613,34 @@ def run_all_tests(test_parent_paths: List[Path],
             print(f"engine-test.conf not found: {engine_test_conf}")
             continue
 
-        outputs_for_integration = []
+        jobs = []
 
         for input_file in test_dir.rglob("*_input.*"):
             test_name = test_parent_name
             if input_file.parent != test_dir:
                 test_name = f"{test_parent_name}-{input_file.parent.name}"
-            engine_test_command = f"engine-test -c {engine_test_conf.resolve().as_posix()} run {test_name} --api-socket {engine_api_socket} -j"
-            command = f"cat {input_file.resolve().as_posix()} | {engine_test_command}"
-
-            output = test(input_file, command, customs, schema_fields)
-            number_outputs += len(output.results)
-            outputs_for_integration.append(output)
+            command = ['engine-test', '-c', engine_test_conf.resolve().as_posix(), 'run', test_name,
+                       '--api-socket', engine_api_socket, '-j']
+
+            jobs.append((input_file.resolve(), command))
+
+        def run_job(input_file: Path, command: List[str]) -> Tuple[EngineTestOutput, set]:
+            # Each worker fills its own custom-field set; the sets are merged after the
+            # futures resolve, so no lock is needed around the shared one.
+            job_customs = set()
+            output = test(input_file, command, job_customs, schema_fields)
+            return output, job_customs
+
+        # Each test blocks on an engine-test subprocess, so overlap them with threads.
+        # Collecting the futures in submit order keeps the outputs in discovery order.
+        with ThreadPoolExecutor(max_workers=min(8, os.cpu_count() or 1)) as executor:
+            futures = [executor.submit(run_job, input_file, command) for input_file, command in jobs]
+            outputs_for_integration = []
+            for future in futures:
+                output, job_customs = future.result()
+                customs |= job_customs
+                number_outputs += len(output.results)
+                outputs_for_integration.append(output)
 
         all_outputs_by_integration[test_parent_name] = outputs_for_integration
 
@@ -459,7 +656,7 @@ def validate_custom_fields(
 
 
 def run_test(test_parent_paths: List[Path], engine_api_socket: str, schema_data) -> List[Result]:
-    schema_fields = set(schema_data.get("fields", {}).keys())
+    schema_fields = frozenset(schema_data.get("fields", {}))
     outputs, number_outputs, all_custom_fields = run_all_tests(test_parent_paths, engine_api_socket, schema_fields)
     results = []
     failures = []
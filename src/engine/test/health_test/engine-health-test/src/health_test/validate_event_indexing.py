@@ -3,10 +3,16 @@ from typing import List, Tuple, Optional, Union, Dict
 from pathlib import Path
 import docker
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 import json
+import orjson
+import os
 import time
 import sys
 import subprocess
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from engine_handler.handler import EngineHandler
 from shared.default_settings import Constants, CONFIG_ENV_KEYS
 import yaml
@@ -17,6 +23,8 @@ from google.protobuf.json_format import ParseDict
 from health_test.utils import *
 
 class UnitOutput:
+    __slots__ = ('index', 'success', 'error', 'output')
+
     def __init__(self, index: int, result: Union[str, dict]):
         self.index = index
         if isinstance(result, str):
@@ -28,6 +36,8 @@ class UnitOutput:
 
 
 class UnitResult:
+    __slots__ = ('index', 'expected', 'diff', 'success')
+
     def __init__(self, index: int, expected: dict, actual: dict):
         self.index = index
         self.expected = expected
@@ -58,18 +68,9 @@ class UnitResult:
                                   "actual": filtered_actual[key]}
 
 
-class UnitOutput:
-    def __init__(self, index: int, result: Union[str, dict]):
-        self.index = index
-        if isinstance(result, str):
-            self.success = False
-            self.error = result
-        elif isinstance(result, dict):
-            self.success = True
-            self.output = result
-
-
 class EngineTestOutput:
+    __slots__ = ('name', 'command', 'results')
+
     def __init__(self, name: str, command: str):
         self.name = name
         self.command = command
@@ -80,6 +81,8 @@ class EngineTestOutput:
 
 
 class TestResult:
+    __slots__ = ('name', 'results', 'success', 'test_error', 'command')
+
     def __init__(self, name: str, command: Optional[str] = None):
         self.name = name
         self.results: List[UnitResult] = []
@@ -98,6 +101,8 @@ class TestResult:
 
 
 class Result:
+    __slots__ = ('name', 'results', 'success', 'test_error')
+
     def __init__(self, name: str):
         self.name = name
         self.results: List[TestResult] = []
@@ -114,49 +119,105 @@ class Result:
         self.test_error = error
 
     def __str__(self) -> str:
-        out = f"{self.name} -> {'Success' if self.success else 'Failure'}"
+        # Accumulate the report pieces and join once; += re-copies the whole string
+        # on every append, which is quadratic on large failure reports.
+        parts = [f"{self.name} -> {'Success' if self.success else 'Failure'}"]
         if self.test_error:
-            out += f"\n  Error: {self.test_error}"
+            parts.append(f"\n  Error: {self.test_error}")
         elif not self.success:
             for result in self.results:
-                out += f"\n  {result.name} -> {'Success' if result.success else 'Failure'}"
+                parts.append(f"\n  {result.name} -> {'Success' if result.success else 'Failure'}")
                 if not result.success and result.command:
-                    out += f"\n    Command: {result.command}"
+                    parts.append(f"\n    Command: {result.command}")
                 if result.test_error:
-                    out += f"\n    Error: {result.test_error}"
+                    parts.append(f"\n    Error: {result.test_error}")
                 elif not result.success:
-                    out += "\n    Event index:"
+                    parts.append("\n    Event index:")
                     for unit_result in result.results:
-                        out += f"\n      {unit_result.index} -> {'Success' if unit_result.success else 'Failure'}"
+                        parts.append(
+                            f"\n      {unit_result.index} -> {'Success' if unit_result.success else 'Failure'}")
                         if not unit_result.success:
                             for key, value in unit_result.diff.items():
-                                out += f"\n        {key}: {value}"
+                                parts.append(f"\n        {key}: {value}")
 
-        return out
+        return ''.join(parts)
 
 
 class OpensearchManagement:
     def __init__(self):
         self.offset = 0
+        self._container = None
+        # One pooled keep-alive session for every OpenSearch call instead of a fresh
+        # TCP connection per request.
+        self.http = requests.Session()
+        # Transient errors back off exponentially and honor Retry-After instead of
+        # hammering the server with fixed-delay retries.
+        retries = Retry(total=3, backoff_factor=0.2, status_forcelist=[429, 502, 503, 504],
+                        allowed_methods=frozenset(['GET', 'PUT', 'POST', 'DELETE', 'HEAD']))
+        self.http.mount('http://', HTTPAdapter(pool_connections=10, pool_maxsize=20, max_retries=retries))
 
     def stop(self):
-        for container in self.client.containers.list():
-            try:
-                container.stop()
-                container.remove()
-            except Exception as e:
-                print(f"Error stopping or removing container {container.id}: {e}")
-        self.client.containers.prune()
+        # Tear down only the container started by init_opensearch instead of listing
+        # and pruning every container on the host.
+        container = self._container
+        if container is None:
+            return
+        try:
+            container.stop(timeout=5)
+            container.remove()
+        except Exception as e:
+            print(f"Error stopping or removing container {container.id}: {e}")
+        self._container = None
 
     def init_index(self, template_path: Path) -> requests.Response:
         with open(template_path, 'r') as template_file:
             template_json = json.load(template_file)
+            template = template_json['template']
+            # The index is short-lived and single-node: disable the periodic refresh and
+            # replicas during ingest; readers call refresh_index explicitly before searching.
+            settings = template.setdefault('settings', {}).setdefault('index', {})
+            settings['refresh_interval'] = '-1'
+            settings['number_of_replicas'] = 0
+            # Throwaway test data: fsync the translog in the background instead of
+            # on every indexing request.
+            settings['translog.durability'] = 'async'
             headers = {"Content-Type": "application/json"}
             url = f'http://localhost:9200/{Constants.INDEX_PATTERN}'
-            response = requests.put(url, data=json.dumps(template_json['template']), headers=headers)
+            response = self.http.put(url, data=json.dumps(template), headers=headers)
             return response
 
+    def refresh_index(self):
+        """Make the documents ingested so far searchable with a single explicit refresh."""
+        self.http.post(f'http://localhost:9200/{Constants.INDEX_PATTERN}/_refresh')
+
+    def _reuse_running_cluster(self, template_path: Path) -> bool:
+        """Reuse an already running cluster when OPENSEARCH_REUSE=1, wiping the index
+        contents instead of paying a container boot and index bootstrap per run."""
+        if os.environ.get('OPENSEARCH_REUSE') != '1':
+            return False
+        try:
+            if self.http.get('http://localhost:9200', timeout=5).status_code != 200:
+                return False
+        except requests.exceptions.ConnectionError:
+            return False
+
+        index_url = f'http://localhost:9200/{Constants.INDEX_PATTERN}'
+        if self.http.head(index_url).status_code == 200:
+            self.http.post(f'{index_url}/_delete_by_query?refresh=true',
+                           json={"query": {"match_all": {}}},
+                           headers={"Content-Type": "application/json"})
+        else:
+            self.init_index(template_path)
+
+        print("Reusing running OpenSearch cluster (OPENSEARCH_REUSE=1)")
+        return True
+
     def init_opensearch(self, template_path: Path):
+        # When reusing a cluster no container handle is kept, so stop() leaves it
+        # running for the next invocation.
+        if self._reuse_running_cluster(template_path):
+            return
+
         self.client = docker.from_env()
         env_vars = {
             'discovery.type': 'single-node',
@@ -164,34 +225,43 @@ class OpensearchManagement:
             'OPENSEARCH_INITIAL_ADMIN_PASSWORD': 'WazuhTest99$',
             'OPENSEARCH_LOG_LEVEL': 'TRACE'
         }
-        self.client.containers.run("opensearchproject/opensearch", detach=True, ports={'9200/tcp': 9200},
-                                   environment=env_vars, name='opensearch', stdout=True, stderr=True)
+        self._container = self.client.containers.run(
+            "opensearchproject/opensearch", detach=True, ports={'9200/tcp': 9200},
+            environment=env_vars, name='opensearch', stdout=True, stderr=True)
 
+        delay = 0.5
         while True:
             try:
-                response = requests.get('http://localhost:9200')
+                response = self.http.get('http://localhost:9200')
                 if response.status_code == 200:
                     if self.init_index(template_path).status_code == 200:
                         break
             except requests.exceptions.ConnectionError:
                 pass
-            time.sleep(1)
+            # Exponential backoff while the container boots; the cluster takes a while
+            # to come up, so a fixed 1s poll just wastes round trips early on.
+            time.sleep(delay)
+            delay = min(delay * 2, 10)
 
         try:
-            url_health = 'http://localhost:9200/_cluster/health?wait_for_status=green&timeout=10s'
-            response = requests.get(url_health)
+            url_health = 'http://localhost:9200/_cluster/health?wait_for_status=green&timeout=30s'
+            response = self.http.get(url_health)
             response.raise_for_status()
-            assert response.status_code == 200, f"Expected status code 200, but got {response.status_code}"
-            assert response.json()['status'] == 'green', f"Expected status 'green', but got {response.json()['status']}"
+            if response.status_code != 200:
+                raise AssertionError(f"Expected status code 200, but got {response.status_code}")
+            health_status = response.json()['status']
+            if health_status != 'green':
+                raise AssertionError(f"Expected status 'green', but got {health_status}")
             counter = 0
             while counter < 10:
                 url = 'http://localhost:9200/_cat/indices'
-                response = requests.get(url)
+                response = self.http.get(url)
                 if response.status_code == 200 and Constants.INDEX_PATTERN in response.text:
                     break
                 time.sleep(1)
                 counter += 1
-            assert counter < 10, "The index was not created"
+            if counter >= 10:
+                raise AssertionError("The index was not created")
 
         except requests.RequestException as e:
             print(f"HTTP request error: {e}")
@@ -206,36 +276,47 @@ class OpensearchManagement:
     def read_index(self, result: TestResult, expecteds: List[UnitOutput], retries=5, delay=4) -> bool:
         url_search = f'http://localhost:9200/{Constants.INDEX_PATTERN}/_search'
         headers = {"Content-Type": "application/json"}
-        not_found = []
 
-        for i, expected in enumerate(expecteds):
-            initial_result_size = len(result.results)
-            event_hash = expected.output['event_hash']
-
-            for attempt in range(retries):
-                try:
-                    query = {
-                        "query": {
-                            "term": {
-                                "event_hash": event_hash
-                            }
+        # One terms query covering every expected hash per attempt instead of a search
+        # round trip (with its own retry loop) per expected event.
+        expected_hashes = {expected.output['event_hash'] for expected in expecteds}
+        hits_by_hash = {}
+
+        for attempt in range(retries):
+            try:
+                self.refresh_index()
+                query = {
+                    "size": len(expected_hashes),
+                    "query": {
+                        "terms": {
+                            "event_hash": list(expected_hashes)
                         }
                     }
+                }
 
-                    response = requests.post(url_search, json=query, headers=headers)
-                    response.raise_for_status()
-                    hits = response.json()['hits']['hits']
+                response = self.http.post(url_search, json=query, headers=headers)
+                response.raise_for_status()
+                # orjson decodes the raw bytes directly, skipping requests' charset
+                # detection and the slower stdlib parser on large hit lists.
+                hits = orjson.loads(response.content)['hits']['hits']
 
-                    if len(hits) > 0:
-                        result.add_result(UnitResult(i, hits[0]['_source'], expected.output))
-                        break
-                except requests.ConnectionError as e:
-                    print(f"Connection error: {e}. Retrying...")
+                for hit in hits:
+                    hits_by_hash.setdefault(hit['_source']['event_hash'], hit)
+
+                if len(hits_by_hash) == len(expected_hashes):
+                    break
+            except requests.ConnectionError as e:
+                print(f"Connection error: {e}. Retrying...")
 
-                time.sleep(delay)
+            time.sleep(delay)
 
-            if len(result.results) == initial_result_size:
+        not_found = []
+        for i, expected in enumerate(expecteds):
+            hit = hits_by_hash.get(expected.output['event_hash'])
+            if hit is None:
                 not_found.append(expected)
+            else:
+                result.add_result(UnitResult(i, hit['_source'], expected.output))
 
         if not_found:
             print("The following 'expected' were not found:")
@@ -249,31 +330,47 @@ class OpensearchManagement:
 opensearch_management = OpensearchManagement()
 
 
-def execute(name: str, command: str) -> Tuple[Optional[str], EngineTestOutput]:
-    result = EngineTestOutput(name, command)
-    try:
-        output = subprocess.check_output(
-            command, shell=True, stderr=subprocess.STDOUT)
-    except subprocess.CalledProcessError as e:
-        return f"Error executing command: {e.output.decode()}", result
-
-    output_str = output.decode('utf-8')
-    json_strings = output_str.strip().split('\n')
+def execute(name: str, command: List[str], input_file: Path) -> Tuple[Optional[str], EngineTestOutput]:
+    result = EngineTestOutput(name, f"{' '.join(command)} < {input_file.as_posix()}")
 
-    for i, json_string in enumerate(json_strings):
+    # Run engine-test directly with the input file as stdin instead of spawning a
+    # shell plus `cat`, and parse each stdout line as the child emits it rather than
+    # buffering the whole output first.
+    with open(input_file, 'rb') as stdin:
         try:
-            parsed_json = json.loads(json_string)
-        except json.JSONDecodeError as e:
-            result.add_result(UnitOutput(i, f"Error parsing JSON: {e}"))
-        else:
-            result.add_result(UnitOutput(i, parsed_json))
+            process = subprocess.Popen(command, stdin=stdin, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+        except OSError as e:
+            return f"Error executing command: {e}", result
+
+        # Drain stderr on a side thread: reading stdout to EOF first would deadlock
+        # against a child blocked on a full stderr pipe.
+        stderr_chunks = []
+        stderr_reader = threading.Thread(target=lambda: stderr_chunks.append(process.stderr.read()))
+        stderr_reader.start()
+
+        index = 0
+        for json_line in process.stdout:
+            json_line = json_line.strip()
+            if not json_line:
+                continue
+            try:
+                parsed_json = orjson.loads(json_line)
+            except orjson.JSONDecodeError as e:
+                result.add_result(UnitOutput(index, f"Error parsing JSON: {e}"))
+            else:
+                result.add_result(UnitOutput(index, parsed_json))
+            index += 1
+
+        stderr_reader.join()
+        if process.wait() != 0:
+            return f"Error executing command: {b''.join(stderr_chunks).decode()}", result
 
     return None, result
 
 
-def test(input_file: Path, command: str) -> EngineTestOutput:
+def test(input_file: Path, command: List[str]) -> EngineTestOutput:
     name = input_file.stem.replace("_input", "")
-    error, output = execute(name, command)
+    error, output = execute(name, command, input_file)
 
     if error:
         print(error)
@@ -301,17 +398,22 @@ def run_all_tests(test_parent_paths: List[Path], engine_api_socket: str) -> Dict
             print(f"engine-test.conf not found: {engine_test_conf}")
             continue
 
-        outputs_for_integration = []
+        jobs = []
 
         for input_file in test_dir.rglob("*_input.*"):
             test_name = test_parent_name
             if input_file.parent != test_dir:
                 test_name = f"{test_parent_name}-{input_file.parent.name}"
-            engine_test_command = f"engine-test -c {engine_test_conf.resolve().as_posix()} run {test_name} --api-socket {engine_api_socket} -j"
-            command = f"cat {input_file.resolve().as_posix()} | {engine_test_command}"
+            command = ['engine-test', '-c', engine_test_conf.resolve().as_posix(), 'run', test_name,
+                       '--api-socket', engine_api_socket, '-j']
+
+            jobs.append((input_file.resolve(), command))
 
-            output = test(input_file, command)
-            outputs_for_integration.append(output)
+        # Each test blocks on an engine-test subprocess, so overlap them with threads.
+        # Collecting the futures in submit order keeps the outputs in discovery order.
+        with ThreadPoolExecutor(max_workers=min(8, os.cpu_count() or 1)) as executor:
+            futures = [executor.submit(test, input_file, command) for input_file, command in jobs]
+            outputs_for_integration = [future.result() for future in futures]
 
         all_outputs_by_integration[test_parent_name] = outputs_for_integration
 
@@ -338,10 +440,15 @@ def validate_all_outputs(all_outputs: List[EngineTestOutput], integration: str)
 
 def run_test(test_parent_paths: List[Path], engine_api_socket: str) -> List[Result]:
     all_outputs_integration = run_all_tests(test_parent_paths, engine_api_socket)
-    results = []
 
-    for integration in all_outputs_integration:
-        results.append(validate_all_outputs(all_outputs_integration[integration], integration))
+    # The validations are search-bound, so overlap the per-integration queries instead
+    # of polling the indexer for one integration at a time.
+    with ThreadPoolExecutor(max_workers=min(8, os.cpu_count() or 1)) as executor:
+        futures = [
+            executor.submit(validate_all_outputs, all_outputs_integration[integration], integration)
+            for integration in all_outputs_integration
+        ]
+        results = [future.result() for future in futures]
 
     return results
 